@@ -0,0 +1,660 @@
+"""NPPES data pipeline: filter, enrich, and export the provider search corpus."""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pyarrow import dataset as pads
+from pyarrow import parquet as pq
+
+# Default paths (Dean's machine - override with CLI args)
+INPUT_FILE = r'C:\Users\dean\Downloads\NPPES_Data_Dissemination\npidata_pfile.csv'
+TAXONOMY_FILE = 'nucc_taxonomy.csv'
+ZIP_CENTROID_FILE = 'zip_centroids.csv'
+OUTPUT_PREFIX = 'providers_illinois'
+
+# Reference point for distance: downtown Chicago
+CHICAGO = (41.8781, -87.6298)
+
+# JSONL record serializer: orjson when available, stdlib json otherwise
+# (the fallback unwraps numpy scalars, which orjson handles natively)
+if orjson is not None:
+    def _dumps(record):
+        return orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    def _dumps(record):
+        return json.dumps(record, default=lambda o: o.item()).encode()
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_miles_jit(ref_lat, ref_lon, lats, lons):
+        """Fused haversine loop: no temporaries, SIMD trig via fastmath."""
+        lat1 = math.radians(ref_lat)
+        lon1 = math.radians(ref_lon)
+        out = np.empty(lats.size, dtype=np.float32)
+        for i in prange(lats.size):
+            lat2 = math.radians(lats[i])
+            lon2 = math.radians(lons[i])
+            dphi = lat2 - lat1
+            dlam = lon2 - lon1
+            a = (math.sin(dphi / 2) ** 2 +
+                 math.cos(lat1) * math.cos(lat2) * math.sin(dlam / 2) ** 2)
+            out[i] = 2 * 3958.7613 * math.asin(math.sqrt(a))
+        return out
+
+    # No fastmath here: its nnan assumption would let LLVM delete the
+    # np.isnan branch that routes unrated providers to the short-wait bin
+    @njit(parallel=True, cache=True)
+    def _appointment_kernel(ratings, r_wait, slots_per_day, fill_rate,
+                            wait_out, windows_out):
+        """Fused rating-bin + wait-day + slot-window pass.
+
+        Randomness comes in as the pre-drawn uniforms r_wait/slots/fill so
+        the kernel stays deterministic given its inputs.
+        """
+        for i in prange(ratings.size):
+            r = ratings[i]
+            if np.isnan(r):
+                lo, hi = 1, 10
+            elif r >= 4.5:
+                lo, hi = 14, 30
+            elif r >= 4.0:
+                lo, hi = 7, 21
+            elif r >= 3.0:
+                lo, hi = 3, 14
+            else:
+                lo, hi = 1, 7
+            w = lo + int(r_wait[i] * (hi - lo + 1))
+            if w > hi:
+                w = hi
+            wait_out[i] = w
+
+            per_slot = slots_per_day[i] * fill_rate[i]
+            windows_out[0, i] = int(max(7 - w, 0) * per_slot)
+            windows_out[1, i] = int(max(14 - w, 0) * per_slot)
+            windows_out[2, i] = int(max(30 - w, 0) * per_slot)
+
+
+class NPPESDataPipeline:
+    """Processes the raw NPPES dump into the enriched provider corpus.
+
+    Filters to the configured states, derives readable provider/specialty
+    fields, computes distance from a reference location, and attaches
+    synthetic availability/insurance/rating features for persona re-ranking.
+    """
+
+    # Raw NPPES column names
+    COL_NPI = 'NPI'
+    COL_ENTITY_TYPE = 'Entity Type Code'
+    COL_FIRST_NAME = 'Provider First Name'
+    COL_LAST_NAME = 'Provider Last Name (Legal Name)'
+    COL_ORG_NAME = 'Provider Organization Name (Legal Business Name)'
+    COL_CREDENTIAL = 'Provider Credential Text'
+    COL_ADDRESS_1 = 'Provider First Line Business Practice Location Address'
+    COL_CITY = 'Provider Business Practice Location Address City Name'
+    COL_STATE = 'Provider Business Practice Location Address State Name'
+    COL_ZIP = 'Provider Business Practice Location Address Postal Code'
+    COL_TAXONOMY = 'Healthcare Provider Taxonomy Code_1'
+    COL_ENUM_DATE = 'Provider Enumeration Date'
+    COL_GENDER = 'Provider Gender Code'
+
+    # The ~330-column NPPES dump is projected down to the columns we touch;
+    # everything else is skipped at the CSV parser level
+    USECOLS = [
+        COL_NPI, COL_ENTITY_TYPE, COL_FIRST_NAME, COL_LAST_NAME, COL_ORG_NAME,
+        COL_CREDENTIAL, COL_ADDRESS_1, COL_CITY, COL_STATE, COL_ZIP,
+        COL_TAXONOMY, COL_ENUM_DATE, COL_GENDER,
+    ]
+
+    # Explicit Arrow types for the projected columns: skips per-batch type
+    # inference and pins a stable schema across the whole file (dates stay
+    # strings so the cached %m/%d/%Y parse handles them)
+    ARROW_TYPES = {
+        COL_NPI: pa.int64(),
+        COL_ENTITY_TYPE: pa.int8(),
+        COL_FIRST_NAME: pa.string(),
+        COL_LAST_NAME: pa.string(),
+        COL_ORG_NAME: pa.string(),
+        COL_CREDENTIAL: pa.string(),
+        COL_ADDRESS_1: pa.string(),
+        COL_CITY: pa.string(),
+        COL_STATE: pa.string(),
+        COL_ZIP: pa.string(),
+        COL_TAXONOMY: pa.string(),
+        COL_ENUM_DATE: pa.string(),
+        COL_GENDER: pa.string(),
+    }
+
+    # Post-read dtype hints: category for the low-cardinality columns so
+    # isin/map run on integer codes. Everything else stays Arrow-backed
+    # straight out of to_pandas(types_mapper=pd.ArrowDtype).
+    READ_DTYPES = {
+        'Provider Business Practice Location Address State Name': 'category',
+        'Healthcare Provider Taxonomy Code_1': 'category',
+    }
+
+    # Synthetic insurance networks sampled per provider
+    INSURANCE_NETWORKS = [
+        'Blue Cross Blue Shield',
+        'UnitedHealthcare',
+        'Aetna',
+        'Cigna',
+        'Humana',
+        'Medicare',
+        'Medicaid',
+    ]
+
+    # Probability a provider offers telehealth, by specialty
+    SPECIALTY_TELEHEALTH = {
+        'Psychiatry & Neurology': 0.85,
+        'Counselor': 0.80,
+        'Psychologist': 0.80,
+        'Family Medicine': 0.55,
+        'Internal Medicine': 0.50,
+        'Dermatology': 0.45,
+        'Pediatrics': 0.45,
+        'Surgery': 0.15,
+        'Dentist': 0.10,
+        'Chiropractor': 0.10,
+    }
+
+    def __init__(self, taxonomy_file: str, zip_centroid_file: str,
+                 reference_location=CHICAGO, states=None):
+        self.reference_location = reference_location
+        self.states = states if states is not None else ['IL']
+        self.rng = np.random.default_rng()
+
+        # One run-date snapshot instead of datetime.now() per chunk
+        self.run_date = pd.Timestamp.now().normalize()
+        self.current_year = self.run_date.year
+
+        # Kept so worker processes can rebuild the pipeline from paths
+        self.taxonomy_file = taxonomy_file
+        self.zip_centroid_file = zip_centroid_file
+
+        self.load_taxonomy_reference(taxonomy_file)
+        self.load_zip_centroids(zip_centroid_file)
+
+    def load_taxonomy_reference(self, taxonomy_file: str):
+        """Load the NUCC taxonomy reference and build searchable specialty text."""
+        self.taxonomy_df = pd.read_csv(taxonomy_file, dtype=str)
+
+        self.taxonomy_df['search_text'] = (
+            self.taxonomy_df['Grouping'].fillna('') + ' ' +
+            self.taxonomy_df['Classification'].fillna('') + ' ' +
+            self.taxonomy_df['Specialization'].fillna('')
+        ).str.strip()
+
+        # Plain dict lookups; boolean-indexing the DataFrame per code is a
+        # full linear scan and shows up badly when done per row
+        codes = self.taxonomy_df['Code']
+        self.taxonomy_map = dict(zip(codes, self.taxonomy_df['Classification']))
+        self.taxonomy_search_map = dict(zip(codes, self.taxonomy_df['search_text']))
+        self.taxonomy_grouping_map = dict(zip(codes, self.taxonomy_df['Grouping']))
+        self.taxonomy_specialization_map = dict(zip(codes, self.taxonomy_df['Specialization']))
+
+        print(f"Loaded {len(self.taxonomy_df)} taxonomy codes")
+
+    def get_taxonomy_search_text(self, code):
+        """Return searchable specialty text for a taxonomy code."""
+        if pd.isna(code):
+            return ''
+        return self.taxonomy_search_map.get(code, '')
+
+    def get_specialty_info(self, code):
+        """Return (grouping, classification, specialization) for a taxonomy code."""
+        if code not in self.taxonomy_map:
+            return None, None, None
+        return (self.taxonomy_grouping_map[code],
+                self.taxonomy_map[code],
+                self.taxonomy_specialization_map[code])
+
+    def load_zip_centroids(self, zip_centroid_file: str):
+        """Load ZIP centroids as parallel float32 arrays plus a zip -> row index."""
+        zip_df = pd.read_csv(zip_centroid_file, dtype={'zip_code': str})
+
+        codes = zip_df['zip_code'].str[:5]
+        keep = ~codes.duplicated()
+        codes = codes[keep]
+
+        # float32 is plenty for miles-level precision and quarters the table
+        # versus the old dict of Python float tuples
+        self.zip_lats = zip_df.loc[keep, 'latitude'].to_numpy(np.float32)
+        self.zip_lons = zip_df.loc[keep, 'longitude'].to_numpy(np.float32)
+        self.zip_index = {z: i for i, z in enumerate(codes)}
+
+        # The same ZIPs recur across every chunk, so compute the distance for
+        # each known ZIP exactly once and map per chunk from this table.
+        miles = np.round(self.haversine_miles(self.zip_lats, self.zip_lons), 1)
+        self.zip_distance_miles = dict(zip(codes, miles))
+
+        print(f"Loaded {len(self.zip_index)} ZIP centroids")
+
+    def haversine_miles(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Vectorized haversine distance (miles) from the reference location.
+
+        Uses the fused Numba kernel when available (warmed with a tiny call
+        so JIT compilation doesn't land inside the centroid pass); otherwise
+        falls back to the NumPy expression below.
+        """
+        if NUMBA_AVAILABLE:
+            _haversine_miles_jit(self.reference_location[0], self.reference_location[1],
+                                 np.zeros(2, np.float32), np.zeros(2, np.float32))
+            return _haversine_miles_jit(
+                self.reference_location[0], self.reference_location[1],
+                np.ascontiguousarray(lats, dtype=np.float32),
+                np.ascontiguousarray(lons, dtype=np.float32))
+
+        lat1 = np.deg2rad(self.reference_location[0])
+        lon1 = np.deg2rad(self.reference_location[1])
+        lat2 = np.deg2rad(lats)
+        lon2 = np.deg2rad(lons)
+
+        dphi = lat2 - lat1
+        dlam = lon2 - lon1
+        a = np.sin(dphi / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlam / 2) ** 2
+        return 2 * 3958.7613 * np.arcsin(np.sqrt(a))
+
+    def generate_rating_features(self, chunk: pd.DataFrame):
+        """Attach synthetic rating/review features (70% of providers have ratings)."""
+        n = len(chunk)
+
+        has_rating = self.rng.random(n) < 0.7
+
+        # np.where keeps these on NumPy instead of boolean-masked writes,
+        # which reallocate (and can upcast) the arrays
+        ratings = np.where(has_rating,
+                           np.round(1.0 + 4.0 * self.rng.beta(8, 2, n), 1),
+                           np.nan)
+        num_reviews = np.where(
+            has_rating,
+            (chunk['years_experience'].to_numpy() *
+             self.rng.uniform(5, 20, n)).astype(np.int32),
+            0)
+
+        chunk['has_rating'] = has_rating
+        chunk['average_rating'] = ratings
+        chunk['num_reviews'] = num_reviews
+
+    def generate_appointment_features(self, chunk: pd.DataFrame):
+        """Attach synthetic appointment availability features."""
+        n = len(chunk)
+        today = self.run_date
+
+        ratings = chunk['average_rating'].to_numpy(dtype='float64', na_value=np.nan)
+        slots_per_day = self.rng.uniform(2, 8, n)
+        fill_rate = self.rng.uniform(0.3, 0.8, n)
+
+        if NUMBA_AVAILABLE:
+            # One fused pass over rating bin, wait draw, and slot windows;
+            # avoids the per-bin masks and window temporaries below
+            wait = np.empty(n, dtype=np.int32)
+            windows = np.empty((3, n), dtype=np.int32)
+            _appointment_kernel(ratings, self.rng.random(n), slots_per_day,
+                                fill_rate, wait, windows)
+            for row, window in enumerate((7, 14, 30)):
+                chunk[f'appointments_available_{window}days'] = windows[row]
+        else:
+            # Fill wait days per rating bin with one randint draw per bin
+            # instead of a per-row Python branch; higher-rated providers
+            # are busier
+            wait = np.empty(n, dtype=np.int32)
+            rating_bins = [
+                (np.isnan(ratings), 1, 10),
+                (ratings >= 4.5, 14, 30),
+                ((ratings >= 4.0) & (ratings < 4.5), 7, 21),
+                ((ratings >= 3.0) & (ratings < 4.0), 3, 14),
+                (ratings < 3.0, 1, 7),
+            ]
+            for mask, lo, hi in rating_bins:
+                count = int(mask.sum())
+                if count:
+                    wait[mask] = self.rng.integers(lo, hi + 1, size=count)
+
+            for window in (7, 14, 30):
+                chunk[f'appointments_available_{window}days'] = (
+                    np.maximum(window - wait, 0) * slots_per_day * fill_rate
+                ).astype(np.int32)
+
+        chunk['wait_days'] = wait
+        chunk['soonest_appointment_date'] = (
+            today + pd.to_timedelta(wait, unit='D')).strftime('%Y-%m-%d')
+        chunk['availability_score'] = np.round(1.0 - wait / 30.0, 3)
+
+    def generate_insurance_features(self, chunk: pd.DataFrame):
+        """Attach synthetic insurance network features."""
+        n = len(chunk)
+        networks = np.array(self.INSURANCE_NETWORKS)
+        num_networks = len(networks)
+
+        # Uniform without-replacement sample of k networks per provider:
+        # rank random scores per row and keep the k smallest. One (n, 7)
+        # boolean matrix replaces per-row random.sample plus six membership
+        # scans over Python lists.
+        k = self.rng.integers(2, 7, n)
+        ranks = self.rng.random((n, num_networks)).argsort(axis=1).argsort(axis=1)
+        mask = ranks < k[:, None]
+
+        net_idx = {name: i for i, name in enumerate(self.INSURANCE_NETWORKS)}
+        chunk['accepted_networks'] = [', '.join(networks[row]) for row in mask]
+        chunk['network_breadth'] = np.round(mask.sum(axis=1) / num_networks, 2)
+        chunk['in_network_bcbs'] = mask[:, net_idx['Blue Cross Blue Shield']]
+        chunk['in_network_uhc'] = mask[:, net_idx['UnitedHealthcare']]
+        chunk['accepts_medicare'] = mask[:, net_idx['Medicare']]
+        chunk['accepts_medicaid'] = mask[:, net_idx['Medicaid']]
+
+    def process_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Transform one raw NPPES chunk into enriched provider records."""
+        # State filtering now happens in the Arrow scanner; only the
+        # entity-type filter remains here. reset_index stands in for the
+        # old defensive .copy() - all assignments below are whole-column.
+        chunk = chunk[chunk[self.COL_ENTITY_TYPE].isin([1, 2])].reset_index(drop=True)
+
+        if len(chunk) == 0:
+            return chunk
+
+        # Distance from reference location, precomputed per ZIP at load time.
+        # COL_ZIP is Arrow-backed, so the slice runs as a C kernel.
+        chunk['zip_5'] = chunk[self.COL_ZIP].str.slice(0, 5)
+        chunk['distance_miles'] = chunk['zip_5'].map(self.zip_distance_miles)
+
+        # Provider display name: "First Last" for individuals, org name
+        # otherwise. Each component is filled/stripped once and title-cased
+        # in a single pass per branch before the branchless select.
+        first = chunk[self.COL_FIRST_NAME].fillna('').str.strip()
+        last = chunk[self.COL_LAST_NAME].fillna('').str.strip()
+        org = chunk[self.COL_ORG_NAME].fillna('').str.strip()
+        mask_individual = chunk[self.COL_ENTITY_TYPE] == 1
+        chunk['provider_name'] = np.where(
+            mask_individual,
+            (first + ' ' + last).str.strip().str.title(),
+            org.str.title(),
+        )
+
+        # str.cat builds the address in one pass instead of chaining +,
+        # which allocates a fresh intermediate Series per segment
+        chunk['full_address'] = (
+            chunk[self.COL_ADDRESS_1].fillna('').str.strip().str.cat(
+                [chunk[self.COL_CITY].fillna('').str.strip(),
+                 chunk[self.COL_STATE].astype(str).str.strip(),
+                 chunk['zip_5']],
+                sep=', ', na_rep='')
+            .str.replace(r'(,\s*)+', ', ', regex=True)
+            .str.strip(', ')
+        )
+
+        # Specialty fields from the taxonomy reference
+        chunk['specialty_code'] = chunk[self.COL_TAXONOMY]
+        # Category dtype: a few hundred distinct specialties per chunk, so
+        # downstream map/compare work runs on integer codes. The map runs
+        # on an object intermediate because .map on a categorical yields a
+        # categorical that fillna cannot extend with a new category.
+        codes = chunk['specialty_code'].astype(object)
+        chunk['specialty_readable'] = (
+            codes.map(self.taxonomy_map).fillna('Unknown').astype('category'))
+        chunk['specialty_search_text'] = codes.map(self.taxonomy_search_map).fillna('')
+
+        # Years of experience from NPI enumeration date
+        current_year = self.current_year
+        # Explicit format skips inference; cache=True dedupes the repeated dates
+        chunk['enumeration_date'] = pd.to_datetime(
+            chunk[self.COL_ENUM_DATE], errors='coerce', format='%m/%d/%Y', cache=True)
+        years = chunk['enumeration_date'].dt.year.fillna(current_year).astype('int16')
+        chunk['years_experience'] = (current_year - years).clip(0, 50).astype('int8')
+
+        # Synthetic persona features: one RNG draw for all boolean columns,
+        # telehealth compared against per-specialty probabilities
+        n = len(chunk)
+        telehealth_probs = chunk['specialty_readable'].astype(object).map(
+            self.SPECIALTY_TELEHEALTH).fillna(0.4).to_numpy()
+        r = self.rng.random((6, n))
+        chunk['telehealth_available'] = r[0] < telehealth_probs
+        chunk['speaks_spanish'] = r[1] < 0.15
+        chunk['speaks_chinese'] = r[2] < 0.05
+        chunk['evening_hours'] = r[3] < 0.3
+        chunk['weekend_hours'] = r[4] < 0.2
+        chunk['accepting_new_patients'] = r[5] < 0.7
+
+        self.generate_rating_features(chunk)
+        self.generate_appointment_features(chunk)
+        self.generate_insurance_features(chunk)
+
+        # Search text for the Lucene index, assembled with vectorized string
+        # ops instead of a per-row apply(axis=1)
+        name = chunk['provider_name'].fillna('')
+        cred = chunk[self.COL_CREDENTIAL].fillna('').astype(str)
+        spec = chunk['specialty_readable'].astype(str)
+        city = chunk[self.COL_CITY].fillna('').astype(str)
+        state = chunk[self.COL_STATE].fillna('').astype(str)
+
+        feature_tokens = pd.Series(
+            np.where(chunk['telehealth_available'], 'telehealth ', '') +
+            np.where(chunk['speaks_spanish'], 'Spanish ', '') +
+            np.where(chunk['speaks_chinese'], 'Chinese ', '') +
+            np.where(chunk['evening_hours'], 'evening hours ', '') +
+            np.where(chunk['weekend_hours'], 'weekend hours ', ''),
+            index=chunk.index,
+        ).str.strip()
+
+        chunk['search_text'] = (
+            name.str.cat(
+                [cred, spec, city, state, chunk['specialty_search_text'], feature_tokens],
+                sep=' | ', na_rep='')
+            .str.replace(r'(\s*\|\s*)+', ' | ', regex=True)
+            .str.strip(' |')
+        )
+
+        final_cols = [
+            self.COL_NPI, 'provider_name', self.COL_CREDENTIAL, self.COL_GENDER,
+            'specialty_code', 'specialty_readable', 'specialty_search_text',
+            self.COL_CITY, self.COL_STATE, 'zip_5', 'full_address', 'distance_miles',
+            'years_experience', 'has_rating', 'average_rating', 'num_reviews',
+            'wait_days', 'soonest_appointment_date', 'appointments_available_7days',
+            'appointments_available_14days', 'appointments_available_30days',
+            'availability_score', 'evening_hours', 'weekend_hours',
+            'telehealth_available', 'accepted_networks', 'network_breadth',
+            'in_network_bcbs', 'in_network_uhc', 'accepts_medicare',
+            'accepts_medicaid', 'speaks_spanish', 'speaks_chinese',
+            'accepting_new_patients', 'search_text',
+        ]
+        return chunk.loc[:, final_cols]
+
+    def process_full_dataset(self, input_file: str, output_prefix: str,
+                             chunk_size: int = 50000, legacy_output: bool = False,
+                             workers: int = None):
+        """Stream the raw NPPES CSV and write the enriched corpus as Parquet.
+
+        Batching is driven by the Arrow reader's 64 MB block size;
+        ``chunk_size`` is kept for callers that tune row-count batching.
+        Chunks are transformed in ``workers`` processes (default: CPU count)
+        while reading and writing stay in the main process. Pass
+        ``legacy_output=True`` to also write the old CSV + JSONL pair.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        start = time.time()
+        total_rows = 0
+        kept_rows = 0
+        chunk_num = 0
+
+        parquet_path = f"{output_prefix}.parquet"
+        writer = None
+        csv_writer = None
+        jsonl_file = None
+        if legacy_output:
+            jsonl_file = open(f"{output_prefix}.jsonl", 'wb')
+
+        # Accumulate processed chunks and write in ~500k-row batches to
+        # amortize writer dispatch and produce larger Parquet row groups
+        flush_rows = 500_000
+        pending = []
+        pending_rows = 0
+
+        def flush_pending():
+            nonlocal pending, pending_rows, writer, csv_writer
+            if not pending:
+                return
+            merged = pd.concat(pending, copy=False) if len(pending) > 1 else pending[0]
+            pending = []
+            pending_rows = 0
+
+            # Categorical columns hold chunk-local category sets, so their
+            # Arrow form is unstable across flushes: concat over differing
+            # categories falls back to plain values while a lone chunk
+            # stays dictionary-encoded (with a flush-dependent index
+            # width), and the Parquet/CSV writers reject any schema
+            # change. Decode them so every flush emits string columns.
+            for cat_col in merged.columns[(merged.dtypes == 'category').to_numpy()]:
+                merged[cat_col] = merged[cat_col].astype(object)
+
+            table = pa.Table.from_pandas(merged, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, table.schema,
+                                          compression='snappy')
+            writer.write_table(table)
+
+            if legacy_output:
+                # Reuse the Arrow table: CSVWriter formats in C++ and
+                # handles the header on open, unlike per-flush to_csv
+                if csv_writer is None:
+                    csv_writer = pacsv.CSVWriter(f"{output_prefix}.csv", table.schema)
+                csv_writer.write_table(table)
+                jsonl_file.write(b'\n'.join(
+                    _dumps(record)
+                    for record in merged.to_dict(orient='records')) + b'\n')
+
+        # Progress is rate-limited to once per second: an update per chunk
+        # forces a console redraw per flush, which serializes on Windows
+        last_print = 0.0
+
+        def write_processed(processed):
+            nonlocal kept_rows, chunk_num, pending_rows, last_print
+            chunk_num += 1
+            if len(processed) == 0:
+                return
+            kept_rows += len(processed)
+            pending.append(processed)
+            pending_rows += len(processed)
+            if pending_rows >= flush_rows:
+                flush_pending()
+
+            now = time.time()
+            if now - last_print > 1.0:
+                last_print = now
+                sys.stdout.write(f"Chunk {chunk_num}: {total_rows:,} rows read, "
+                                 f"{kept_rows:,} kept ({now - start:.0f}s)\r")
+                sys.stdout.flush()
+
+        try:
+            # Predicate pushdown: for an IL-only run ~97% of rows never get
+            # materialized as pandas objects
+            csv_format = pads.CsvFileFormat(
+                read_options=pacsv.ReadOptions(block_size=64 << 20),
+                convert_options=pacsv.ConvertOptions(
+                    strings_can_be_null=True,
+                    column_types=self.ARROW_TYPES),
+            )
+            state_filter = (pads.field(self.COL_STATE).isin(self.states)
+                            if self.states else None)
+            batches = pads.dataset(input_file, format=csv_format).to_batches(
+                columns=self.USECOLS, filter=state_filter, batch_size=chunk_size)
+
+            # Main process reads and writes; workers run process_chunk. The
+            # in-flight deque bounds memory and preserves chunk order.
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=(self.taxonomy_file, self.zip_centroid_file,
+                              self.reference_location, self.states)) as pool:
+                in_flight = deque()
+                for batch in batches:
+                    # Arrow-backed columns keep .str/.fillna on C kernels
+                    # instead of object arrays of Python strings
+                    chunk = batch.to_pandas(types_mapper=pd.ArrowDtype)
+                    for col, dtype in self.READ_DTYPES.items():
+                        chunk[col] = chunk[col].astype(dtype)
+                    total_rows += len(chunk)
+
+                    in_flight.append(pool.submit(_process_chunk_worker, chunk))
+                    if len(in_flight) >= workers * 2:
+                        write_processed(in_flight.popleft().result())
+
+                while in_flight:
+                    write_processed(in_flight.popleft().result())
+                flush_pending()
+        finally:
+            if writer is not None:
+                writer.close()
+            if csv_writer is not None:
+                csv_writer.close()
+            if jsonl_file is not None:
+                jsonl_file.close()
+
+        print(f"\n✓ Done: {kept_rows:,} providers written to "
+              f"{parquet_path} in {time.time() - start:.0f}s")
+
+
+# Per-process pipeline instance for ProcessPoolExecutor workers; built once
+# in the initializer so the taxonomy/centroid tables load once per worker
+_worker_pipeline = None
+
+
+def _init_worker(taxonomy_file, zip_centroid_file, reference_location, states):
+    global _worker_pipeline
+    _worker_pipeline = NPPESDataPipeline(taxonomy_file, zip_centroid_file,
+                                         reference_location=reference_location,
+                                         states=states)
+
+
+def _process_chunk_worker(chunk):
+    return _worker_pipeline.process_chunk(chunk)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='NPPES provider data pipeline')
+    parser.add_argument('--input', default=INPUT_FILE, help='Raw NPPES CSV file')
+    parser.add_argument('--taxonomy', default=TAXONOMY_FILE, help='NUCC taxonomy CSV')
+    parser.add_argument('--zip-centroids', default=ZIP_CENTROID_FILE,
+                        help='ZIP centroid CSV (zip_code, latitude, longitude)')
+    parser.add_argument('--output-prefix', default=OUTPUT_PREFIX,
+                        help='Prefix for output CSV/JSONL files')
+    parser.add_argument('--states', nargs='*', default=['IL'],
+                        help='State codes to keep (default: IL)')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--legacy-output', action='store_true',
+                        help='Also write the old CSV + JSONL outputs')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for chunk transforms (default: CPU count)')
+
+    args = parser.parse_args()
+
+    pipeline = NPPESDataPipeline(
+        taxonomy_file=args.taxonomy,
+        zip_centroid_file=args.zip_centroids,
+        states=args.states,
+    )
+    pipeline.process_full_dataset(args.input, args.output_prefix,
+                                  chunk_size=args.chunk_size,
+                                  legacy_output=args.legacy_output,
+                                  workers=args.workers)
@@ -0,0 +1,36 @@
+"""Gunicorn configuration for the provider search API.
+
+gthread workers rather than gevent: pyserini holds JNI state through
+jnius, which cannot be monkey-patched, but it is safe to share across
+threads within a worker.
+"""
+
+import fcntl
+import multiprocessing
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+bind = "0.0.0.0:5001"
+workers = multiprocessing.cpu_count()
+worker_class = "gthread"
+threads = 4
+timeout = 60
+
+
+def post_fork(server, worker):
+    """Give each worker its own search engine and reranker after fork.
+
+    Initialization builds the shared on-disk artifacts (Lucene index,
+    display JSONL, persona weight matrix, rendered spec) when they are
+    missing, so workers take an exclusive lock around it: on a cold
+    start the first worker does the build while its siblings block,
+    then each in turn just loads the finished artifacts. The build is
+    not hoisted into the master because it needs the jnius JVM, which
+    must not be running before fork.
+    """
+    from api import DATA_DIR, init_services
+    with open(DATA_DIR / ".init.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        init_services()
@@ -0,0 +1,93 @@
+"""Optional numba-compiled scoring kernels for the reranker.
+
+Numba is not a hard dependency: when it is missing every entry point
+falls back to the equivalent NumPy expression.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _dot_kernel(features, weights):
+        n, f = features.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            score = np.float32(0.0)
+            for j in range(f):
+                score += features[i, j] * weights[j]
+            out[i] = score
+        return out
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _gather_dot_kernel(matrix, rows, weights):
+        n = rows.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            r = rows[i]
+            score = np.float32(0.0)
+            for j in range(weights.shape[0]):
+                score += matrix[r, j] * weights[j]
+            out[i] = score
+        return out
+
+    @njit(cache=True)
+    def _dot_kernel_i8(features_q, weights_q):
+        n, f = features_q.shape
+        out = np.empty(n, dtype=np.int32)
+        for i in range(n):
+            acc = np.int32(0)
+            for j in range(f):
+                acc += np.int32(features_q[i, j]) * np.int32(weights_q[j])
+            out[i] = acc
+        return out
+
+
+def dot_scores(features: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Row-wise weighted sum of a (N, F) float32 feature matrix."""
+    if NUMBA_AVAILABLE:
+        return _dot_kernel(features, weights)
+    return features @ weights
+
+
+def gather_dot(matrix: np.ndarray, rows: np.ndarray,
+               weights: np.ndarray) -> np.ndarray:
+    """Score selected rows of a feature matrix without gathering a copy.
+
+    Fuses the fancy-index and the weighted sum: each row streams from
+    the store once instead of being materialized into an (N, F)
+    intermediate first.
+    """
+    if NUMBA_AVAILABLE:
+        return _gather_dot_kernel(matrix, rows, weights)
+    return matrix[rows] @ weights
+
+
+def dot_scores_q(features_q: np.ndarray, weights_q: np.ndarray,
+                 scale: float) -> np.ndarray:
+    """int8 weighted sum with int32 accumulation, dequantized by scale."""
+    if NUMBA_AVAILABLE:
+        acc = _dot_kernel_i8(features_q, weights_q)
+    else:
+        acc = features_q.astype(np.int32) @ weights_q.astype(np.int32)
+    return acc.astype(np.float32) * np.float32(scale)
+
+
+def warmup():
+    """Compile the kernels at service start instead of on the first query."""
+    if NUMBA_AVAILABLE:
+        _dot_kernel(np.zeros((2, 3), dtype=np.float32),
+                    np.zeros(3, dtype=np.float32))
+        _dot_kernel_i8(np.zeros((2, 3), dtype=np.int8),
+                       np.zeros(3, dtype=np.int8))
+        _gather_dot_kernel(np.zeros((2, 3), dtype=np.float32),
+                           np.zeros(2, dtype=np.intp),
+                           np.zeros(3, dtype=np.float32))
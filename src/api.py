@@ -21,11 +21,21 @@ if not jnius_config.vm_running:
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from flask import Flask, request, jsonify
+from collections import OrderedDict
+from functools import lru_cache
+import json
+import re
+import threading
+
+from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 from flasgger import Swagger
-from baseline_retrieval import ProviderSearchEngine, ensure_index_exists
-from reranker import PersonaReranker, load_provider_data
+from baseline_retrieval import (ProviderSearchEngine, display_jsonl_path,
+                                ensure_index_exists)
+from jsonl_offsets import fetch_records
+from reranker import PersonaReranker
+from score_cache import ScorerCache
+from _jit import warmup as jit_warmup
 
 app = Flask(__name__)
 CORS(app)
@@ -35,13 +45,17 @@ DATA_DIR = PROJECT_ROOT / "data"
 INDEX_DIR = PROJECT_ROOT / "indexes" / "provider_index"
 CONFIG_DIR = PROJECT_ROOT / "config"
 JSONL_PATH = DATA_DIR / "providers_illinois.jsonl"
+DISPLAY_JSONL_PATH = Path(display_jsonl_path(str(JSONL_PATH)))
 SWAGGER_FILE = PROJECT_ROOT / "swagger.yaml"
+STATIC_DIR = PROJECT_ROOT / "static"
 
 swagger_config = {
     "headers": [],
     "specs": [{
         "endpoint": 'apispec',
-        "route": '/apispec.json',
+        # The live (re-rendered) spec; /apispec.json serves the static
+        # copy written at startup
+        "route": '/apispec_live.json',
         "rule_filter": lambda rule: True,
         "model_filter": lambda tag: True,
     }],
@@ -63,10 +77,90 @@ def init_services():
     print("Initializing provider search service...")
     ensure_index_exists(str(INDEX_DIR), str(DATA_DIR))
     search_engine = ProviderSearchEngine(str(INDEX_DIR))
-    reranker = PersonaReranker(config_dir=str(CONFIG_DIR))
+    score_cache = ScorerCache(str(DATA_DIR / "score_cache.sqlite"))
+    reranker = PersonaReranker(config_dir=str(CONFIG_DIR), score_cache=score_cache)
+    _cached_baseline_search.cache_clear()
+    with _provider_cache_lock:
+        _provider_cache.clear()
+    jit_warmup()
+    _write_static_apispec()
     print(f"Service ready with {len(reranker.get_available_personas())} personas\n")
 
 
+# Decoded provider records, LRU-evicted: popular queries hit the same
+# ~100 NPIs repeatedly, so keep their dicts instead of re-reading and
+# re-decoding them from the JSONL on every request
+_PROVIDER_CACHE_MAX = 50000
+_provider_cache = OrderedDict()
+_provider_cache_lock = threading.Lock()
+
+
+def get_provider_records(provider_ids, jsonl_path=None):
+    """Fetch provider records, serving repeats from the in-memory LRU."""
+    jsonl_path = str(jsonl_path or JSONL_PATH)
+    records = {}
+    missing = []
+
+    with _provider_cache_lock:
+        for pid in (str(p) for p in provider_ids):
+            record = _provider_cache.get((jsonl_path, pid))
+            if record is not None:
+                _provider_cache.move_to_end((jsonl_path, pid))
+                records[pid] = record
+            else:
+                missing.append(pid)
+
+    if missing:
+        fetched = fetch_records(jsonl_path, missing)
+        with _provider_cache_lock:
+            for pid, record in fetched.items():
+                _provider_cache[(jsonl_path, pid)] = record
+                _provider_cache.move_to_end((jsonl_path, pid))
+            while len(_provider_cache) > _PROVIDER_CACHE_MAX:
+                _provider_cache.popitem(last=False)
+        records.update(fetched)
+
+    return records
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace and lowercase so trivial variants share a cache slot."""
+    return re.sub(r'\s+', ' ', query.strip().lower())
+
+
+# Baseline results are deterministic per (method, query, k) for a fixed
+# index, and agents repeat the same query across personas, so cache the
+# Lucene round-trip
+@lru_cache(maxsize=2048)
+def _cached_baseline_search(method: str, query: str, k: int):
+    if method == 'bm25':
+        results = search_engine.bm25_search(query, k=k)
+    else:
+        results = search_engine.ql_dirichlet_search(query, k=k)
+    # Store an immutable form so cached entries can't be mutated by callers
+    return tuple((r['provider_id'], r['score']) for r in results)
+
+
+def baseline_search(method: str, query: str, k: int = 100):
+    """Cached baseline retrieval returning fresh result dicts."""
+    hits = _cached_baseline_search(method, _normalize_query(query), k)
+    return [{'provider_id': pid, 'score': score} for pid, score in hits]
+
+
+def _write_static_apispec():
+    """Render the Swagger spec once so doc requests skip YAML re-parsing."""
+    STATIC_DIR.mkdir(exist_ok=True)
+    with app.test_request_context():
+        specs = swagger.get_apispecs()
+    (STATIC_DIR / "apispec.json").write_text(json.dumps(specs))
+
+
+@app.route('/apispec.json', methods=['GET'])
+def static_apispec():
+    """Serve the spec rendered at startup instead of re-templating YAML."""
+    return send_from_directory(str(STATIC_DIR), 'apispec.json')
+
+
 @app.route('/', methods=['GET'])
 def home():
     """API information endpoint."""
@@ -162,11 +256,8 @@ def search():
         }), 400
 
     try:
-        # Baseline search
-        if method == 'bm25':
-            baseline_results = search_engine.bm25_search(query, k=100)
-        else:
-            baseline_results = search_engine.ql_dirichlet_search(query, k=100)
+        # Baseline search (cached per method/query)
+        baseline_results = baseline_search(method, query, k=100)
 
         if not baseline_results:
             return jsonify({
@@ -178,11 +269,20 @@ def search():
             })
 
         provider_ids = [r['provider_id'] for r in baseline_results]
-        provider_data = load_provider_data(str(JSONL_PATH), provider_ids)
+
+        # Persona re-ranking needs the full records for feature
+        # extraction; plain searches only return display fields, so they
+        # read the much smaller display JSONL when it exists
+        if not persona_id and DISPLAY_JSONL_PATH.exists():
+            provider_data = get_provider_records(provider_ids, DISPLAY_JSONL_PATH)
+        else:
+            provider_data = get_provider_records(provider_ids)
 
         # Apply persona re-ranking if requested
         if persona_id and reranker:
-            results = reranker.rerank(baseline_results, provider_data, persona_id, alpha=alpha)
+            results = reranker.rerank(baseline_results, provider_data, persona_id,
+                                      alpha=alpha, top_k=k,
+                                      include_features=include_features)
         else:
             results = []
             for i, baseline_result in enumerate(baseline_results):
@@ -200,10 +300,6 @@ def search():
 
         results = results[:k]
 
-        if not include_features:
-            for result in results:
-                result.pop('features', None)
-
         return jsonify({
             'query': query,
             'method': method,
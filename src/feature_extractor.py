@@ -1,7 +1,35 @@
 """Feature extraction and normalization for provider re-ranking."""
 
 import math
-from typing import Dict, Any
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Canonical feature order for matrix scoring: column i of a stacked
+# feature matrix always corresponds to FEATURE_ORDER[i]
+FEATURE_ORDER = [
+    'distance_miles',
+    'availability_score',
+    'wait_days',
+    'appointments_available_7days',
+    'appointments_available_14days',
+    'appointments_available_30days',
+    'evening_hours',
+    'weekend_hours',
+    'telehealth_available',
+    'average_rating',
+    'num_reviews',
+    'years_experience',
+    'has_rating',
+    'network_breadth',
+    'in_network_bcbs',
+    'in_network_uhc',
+    'accepts_medicare',
+    'accepts_medicaid',
+    'speaks_spanish',
+    'speaks_chinese',
+    'accepting_new_patients',
+]
 
 
 class FeatureExtractor:
@@ -15,6 +43,12 @@ class FeatureExtractor:
         self.MAX_REVIEWS = 1000.0
         self.MAX_APPOINTMENTS = 100.0
 
+        # log10 lookup table for review counts: counts are small bounded
+        # ints, so an indexed load replaces the transcendental per call
+        self._review_lut = np.minimum(
+            np.log10(np.arange(int(self.MAX_REVIEWS) + 2) + 1.0)
+            / math.log10(self.MAX_REVIEWS + 1.0), 1.0).astype(np.float32)
+
     def extract_features(self, provider: Dict[str, Any]) -> Dict[str, float]:
         """Extract and normalize all features from provider record."""
         features = {}
@@ -53,6 +87,83 @@ class FeatureExtractor:
 
         return features
 
+    def extract_features_matrix(self, providers: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract normalized features for many providers as one matrix.
+
+        Returns a float32 (N, F) array whose column i corresponds to
+        FEATURE_ORDER[i], filled in place so scoring needs no further
+        stacking or copying. Values match extract_features
+        element-for-element.
+        """
+        n = len(providers)
+        matrix = np.empty((n, len(FEATURE_ORDER)), dtype=np.float32)
+        col = {name: matrix[:, i] for i, name in enumerate(FEATURE_ORDER)}
+
+        def column(key, default):
+            return np.fromiter(
+                ((p.get(key, default) if p.get(key, default) is not None else default)
+                 for p in providers),
+                dtype=np.float32, count=n)
+
+        def flag(key, out):
+            out[:] = np.fromiter(
+                (1.0 if p.get(key) else 0.0 for p in providers),
+                dtype=np.float32, count=n)
+
+        # Convenience
+        dist = column('distance_miles', 50.0)
+        dist = np.where(np.isnan(dist), 50.0, dist)
+        col['distance_miles'][:] = 1.0 - np.minimum(dist / self.MAX_DISTANCE, 1.0)
+        col['availability_score'][:] = column('availability_score', 0.5)
+        # Missing key defaults to 14 exactly like extract_features; an
+        # explicit None gets _normalize_wait_days' 0.5 midpoint
+        wait = np.fromiter(
+            (self.MAX_WAIT_DAYS / 2 if w is None else w
+             for w in (p.get('wait_days', 14) for p in providers)),
+            dtype=np.float32, count=n)
+        col['wait_days'][:] = 1.0 - np.minimum(wait / self.MAX_WAIT_DAYS, 1.0)
+        for window in (7, 14, 30):
+            appts = column(f'appointments_available_{window}days', 0.0)
+            col[f'appointments_available_{window}days'][:] = np.clip(
+                appts / self.MAX_APPOINTMENTS, 0.0, 1.0)
+        flag('evening_hours', col['evening_hours'])
+        flag('weekend_hours', col['weekend_hours'])
+        flag('telehealth_available', col['telehealth_available'])
+
+        # Quality
+        rating = column('average_rating', 0.0)
+        col['average_rating'][:] = np.clip(rating / 5.0, 0.0, 1.0)
+        reviews = column('num_reviews', 0.0)
+        lut_idx = np.clip(reviews, 0, self.MAX_REVIEWS + 1).astype(np.int64)
+        col['num_reviews'][:] = np.where(
+            reviews > 0, self._review_lut[lut_idx], np.float32(0.0))
+        years = column('years_experience', 0.0)
+        col['years_experience'][:] = np.clip(years / self.MAX_EXPERIENCE, 0.0, 1.0)
+        flag('has_rating', col['has_rating'])
+
+        # Cost
+        col['network_breadth'][:] = column('network_breadth', 0.0)
+        flag('in_network_bcbs', col['in_network_bcbs'])
+        flag('in_network_uhc', col['in_network_uhc'])
+        flag('accepts_medicare', col['accepts_medicare'])
+        flag('accepts_medicaid', col['accepts_medicaid'])
+
+        # Demographics
+        flag('speaks_spanish', col['speaks_spanish'])
+        flag('speaks_chinese', col['speaks_chinese'])
+        flag('accepting_new_patients', col['accepting_new_patients'])
+
+        return matrix
+
+    def extract_features_batch(self, providers: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Extract normalized features for many providers as NumPy columns.
+
+        Structure-of-arrays view over extract_features_matrix: each
+        feature maps to one column of the shared (N, F) matrix.
+        """
+        matrix = self.extract_features_matrix(providers)
+        return {name: matrix[:, i] for i, name in enumerate(FEATURE_ORDER)}
+
     def _normalize_distance(self, distance: float) -> float:
         """Invert distance so closer = higher value."""
         if distance is None or math.isnan(distance):
@@ -72,10 +183,10 @@ class FeatureExtractor:
         return min(rating / 5.0, 1.0)
 
     def _normalize_reviews(self, num_reviews: int) -> float:
-        """Log-scale normalization for review counts."""
+        """Log-scale normalization for review counts (LUT-backed)."""
         if num_reviews is None or num_reviews <= 0:
             return 0.0
-        return min(math.log10(num_reviews + 1) / math.log10(self.MAX_REVIEWS + 1), 1.0)
+        return float(self._review_lut[min(int(num_reviews), int(self.MAX_REVIEWS) + 1)])
 
     def _normalize_experience(self, years: int) -> float:
         """Linear normalization of years of experience."""
@@ -0,0 +1,89 @@
+"""NPI -> byte-offset index for fast record lookup in the provider JSONL."""
+
+import json
+import mmap
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+# Matches the NPI field without parsing the whole record
+_NPI_PATTERN = re.compile(rb'"NPI"\s*:\s*"?(\d+)')
+
+# Loaded indexes keyed by path, invalidated when the JSONL mtime changes
+_INDEX_CACHE: Dict[str, Tuple[float, Dict[str, Tuple[int, int]]]] = {}
+
+
+def offset_index_path(jsonl_path: str) -> str:
+    """Sidecar pickle path for a JSONL file (foo.jsonl -> foo.offsets.pkl)."""
+    return str(Path(jsonl_path).with_suffix('.offsets.pkl'))
+
+
+def build_npi_offset_index(jsonl_path: str) -> Dict[str, Tuple[int, int]]:
+    """Stream the JSONL once and persist {NPI: (offset, length)} to a sidecar.
+
+    Only the NPI field is located (via regex) so the build avoids a full
+    JSON parse per line.
+    """
+    index = {}
+    offset = 0
+
+    with open(jsonl_path, 'rb') as f:
+        for line in f:
+            length = len(line)
+            match = _NPI_PATTERN.search(line)
+            if match:
+                index[match.group(1).decode()] = (offset, length)
+            offset += length
+
+    with open(offset_index_path(jsonl_path), 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return index
+
+
+def load_npi_offset_index(jsonl_path: str) -> Dict[str, Tuple[int, int]]:
+    """Return the offset index, (re)building it if missing or stale."""
+    jsonl_mtime = os.path.getmtime(jsonl_path)
+
+    cached = _INDEX_CACHE.get(jsonl_path)
+    if cached and cached[0] == jsonl_mtime:
+        return cached[1]
+
+    sidecar = offset_index_path(jsonl_path)
+    if os.path.exists(sidecar) and os.path.getmtime(sidecar) >= jsonl_mtime:
+        with open(sidecar, 'rb') as f:
+            index = pickle.load(f)
+    else:
+        index = build_npi_offset_index(jsonl_path)
+
+    _INDEX_CACHE[jsonl_path] = (jsonl_mtime, index)
+    return index
+
+
+def fetch_records(jsonl_path: str, provider_ids: Iterable[str]) -> Dict[str, dict]:
+    """Load the requested NPIs by slicing an mmap of the JSONL.
+
+    O(k) in the number of requested ids instead of a full-file scan;
+    unknown ids are silently omitted from the result.
+    """
+    index = load_npi_offset_index(jsonl_path)
+    records = {}
+
+    with open(jsonl_path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for pid in provider_ids:
+            pid = str(pid)
+            entry = index.get(pid)
+            if entry is not None:
+                offset, length = entry
+                records[pid] = _json_loads(mm[offset:offset + length])
+
+    return records
@@ -1,42 +1,194 @@
 """Persona-based re-ranking using feature weights."""
 
+import hashlib
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from feature_extractor import FeatureExtractor, compute_feature_score, flatten_weights
+import numpy as np
+
+from _jit import dot_scores_q, gather_dot
+from feature_extractor import (FEATURE_ORDER, FeatureExtractor,
+                               compute_feature_score, flatten_weights)
+from jsonl_offsets import fetch_records
+
+
+_PERSONA_FILES = {
+    'sarah': 'persona_sarah.json',
+    'marcus': 'persona_marcus.json',
+    'fatima': 'persona_fatima.json',
+    'robert': 'persona_robert.json',
+    'jennifer': 'persona_jennifer.json'
+}
+
+
+@lru_cache(maxsize=8)
+def _read_persona_configs(config_dir: str, mtime_key: float):
+    """Parse the persona JSON files once per (directory, mtime) pair.
+
+    Constructing a second PersonaReranker over the same unchanged
+    configs (e.g. per gunicorn worker thread, or in scripts) skips the
+    file reads entirely; a changed mtime makes a new cache key.
+    """
+    configs = {}
+    for persona_id, filename in _PERSONA_FILES.items():
+        config_path = Path(config_dir) / filename
+        if config_path.exists():
+            with open(config_path, 'r') as f:
+                configs[persona_id] = json.load(f)
+    return configs
+
+
+class FeatureStore:
+    """Append-only struct-of-arrays store of provider feature vectors.
+
+    Rows live in one contiguous float32 matrix with an NPI -> row index,
+    so gathering a candidate set is a single fancy-index on contiguous
+    memory instead of row-by-row copies from scattered per-provider
+    arrays. Vectors are persona-independent, so one stored row serves
+    every persona; memory is bounded by the corpus (~21 floats per
+    provider seen).
+    """
+
+    def __init__(self, initial_capacity: int = 4096, quantized: bool = False):
+        self.matrix = np.empty((initial_capacity, len(FEATURE_ORDER)),
+                               dtype=np.float32)
+        # Optional int8 mirror: features are normalized to [0,1], so a
+        # fixed scale of 127 loses at most 1/254 per feature
+        self.matrix_q = (np.empty_like(self.matrix, dtype=np.int8)
+                         if quantized else None)
+        self.rows = {}
+        self._size = 0
+
+    def add(self, provider_ids: List[str], vectors: np.ndarray):
+        """Append extracted vectors, growing the matrix geometrically."""
+        needed = self._size + len(provider_ids)
+        if needed > len(self.matrix):
+            capacity = max(needed, 2 * len(self.matrix))
+            grown = np.empty((capacity, self.matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self.matrix[:self._size]
+            self.matrix = grown
+            if self.matrix_q is not None:
+                grown_q = np.empty_like(grown, dtype=np.int8)
+                grown_q[:self._size] = self.matrix_q[:self._size]
+                self.matrix_q = grown_q
+        for pid, vec in zip(provider_ids, vectors):
+            self.matrix[self._size] = vec
+            if self.matrix_q is not None:
+                self.matrix_q[self._size] = np.clip(
+                    np.rint(vec * 127.0), -128, 127).astype(np.int8)
+            self.rows[pid] = self._size
+            self._size += 1
+
+    def row_indices(self, provider_ids: List[str]) -> np.ndarray:
+        """Return the store row index for each known id."""
+        return np.fromiter((self.rows[pid] for pid in provider_ids),
+                           dtype=np.intp, count=len(provider_ids))
+
+    def gather(self, provider_ids: List[str]) -> np.ndarray:
+        """Return the (N, F) matrix for known ids in one fancy-index."""
+        return self.matrix[self.row_indices(provider_ids)]
+
+    def gather_q(self, provider_ids: List[str]) -> np.ndarray:
+        """Return the int8 (N, F) matrix for known ids."""
+        return self.matrix_q[self.row_indices(provider_ids)]
 
 
 class PersonaReranker:
     """Re-ranks baseline results using persona-specific feature weights."""
 
-    def __init__(self, config_dir: str = "config"):
+    def __init__(self, config_dir: str = "config", score_cache=None):
         self.config_dir = Path(config_dir)
         self.personas = {}
         self.feature_extractor = FeatureExtractor()
+        # Fixed feature schema shared by every persona weight vector
+        self.feature_names = tuple(FEATURE_ORDER)
+        self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self.score_cache = score_cache
+        # Opt-in int8 scoring: halves bytes through cache at a worst-case
+        # per-feature error of ~1/254, so it is off unless requested
+        self.quantized = os.environ.get('PROVIDER_QUANTIZED_SCORING') == '1'
+        self._fvec_store = FeatureStore(quantized=self.quantized)
         self._load_personas()
+        self._load_weight_matrix()
 
     def _load_personas(self):
         """Load persona configurations from JSON files."""
-        config_files = {
-            'sarah': 'persona_sarah.json',
-            'marcus': 'persona_marcus.json',
-            'fatima': 'persona_fatima.json',
-            'robert': 'persona_robert.json',
-            'jennifer': 'persona_jennifer.json'
-        }
-
-        for persona_id, filename in config_files.items():
+        self._config_mtime = 0.0
+        for persona_id, filename in _PERSONA_FILES.items():
             config_path = self.config_dir / filename
             if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    self.personas[persona_id] = {
-                        'config': config,
-                        'weights': flatten_weights(config)
-                    }
+                self._config_mtime = max(self._config_mtime,
+                                         config_path.stat().st_mtime)
             else:
                 print(f"Warning: Persona config not found: {config_path}")
 
+        configs = _read_persona_configs(str(self.config_dir),
+                                        self._config_mtime)
+        for persona_id, config in configs.items():
+            weights = flatten_weights(config)
+            self.personas[persona_id] = {
+                'config': config,
+                'weights': weights,
+                # Weights as a vector aligned to FEATURE_ORDER, so
+                # scoring a feature matrix is a single matmul
+                'weight_vec': np.array(
+                    [weights.get(name, 0.0) for name in FEATURE_ORDER],
+                    dtype=np.float32),
+                # Keys cached scores; changes when the JSON changes
+                'config_hash': hashlib.sha1(
+                    json.dumps(config, sort_keys=True).encode()).hexdigest()
+            }
+
+    def _load_weight_matrix(self):
+        """Materialize all persona weights as one (P, F) float32 matrix.
+
+        The matrix is persisted to config/persona_weights.npz and
+        memory-mapped on subsequent startups; it is rebuilt whenever a
+        persona JSON is newer than the saved file. Each persona's
+        weight_vec becomes a row view of the shared matrix.
+        """
+        persona_ids = sorted(self.personas)
+        self.persona_index = {pid: row for row, pid in enumerate(persona_ids)}
+        npz_path = self.config_dir / 'persona_weights.npz'
+
+        self.weight_matrix = None
+        if npz_path.exists() and npz_path.stat().st_mtime >= self._config_mtime:
+            data = np.load(npz_path, mmap_mode='r')
+            if list(data['persona_ids']) == persona_ids:
+                self.weight_matrix = data['weights']
+
+        if self.weight_matrix is None:
+            self.weight_matrix = np.stack(
+                [self.personas[pid]['weight_vec'] for pid in persona_ids]) \
+                if persona_ids else np.empty((0, len(FEATURE_ORDER)),
+                                             dtype=np.float32)
+            # Write-then-rename so a concurrent reader (another worker
+            # starting up) never memory-maps a half-written file
+            tmp_path = npz_path.with_suffix('.npz.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, persona_ids=np.array(persona_ids),
+                         weights=self.weight_matrix)
+            os.replace(tmp_path, npz_path)
+
+        for pid in persona_ids:
+            self.personas[pid]['weight_vec'] = \
+                self.weight_matrix[self.persona_index[pid]]
+
+        if self.quantized:
+            for pid in persona_ids:
+                w = self.personas[pid]['weight_vec']
+                w_scale = float(np.abs(w).max()) / 127.0 or 1.0
+                self.personas[pid]['weight_q'] = np.clip(
+                    np.rint(w / w_scale), -128, 127).astype(np.int8)
+                # Combined dequantization: feature scale 1/127 times w_scale
+                self.personas[pid]['dequant_scale'] = w_scale / 127.0
+
+    def get_weight_vector(self, persona_id: str) -> np.ndarray:
+        """Return the persona's weights aligned to FEATURE_ORDER."""
+        return self.personas[persona_id]['weight_vec']
+
     def get_available_personas(self) -> List[str]:
         """Return list of loaded persona IDs."""
         return list(self.personas.keys())
@@ -59,7 +211,9 @@ class PersonaReranker:
         baseline_results: List[Dict[str, Any]],
         provider_data: Dict[str, Dict[str, Any]],
         persona_id: str,
-        alpha: float = 0.7
+        alpha: float = 0.7,
+        top_k: Optional[int] = None,
+        include_features: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Re-rank results using: combined_score = α × baseline + (1-α) × persona_score
@@ -69,70 +223,265 @@ class PersonaReranker:
             provider_data: Map of provider_id -> full provider record
             persona_id: Persona to use for re-ranking
             alpha: Weight for baseline score (higher = more text relevance)
+            top_k: If given, return only the best top_k results (selected
+                via argpartition instead of a full sort)
+            include_features: Attach per-feature values to each result;
+                when False (the API default) the per-provider feature
+                dicts are never materialized
         """
         if persona_id not in self.personas:
             raise ValueError(f"Unknown persona: {persona_id}. Available: {self.get_available_personas()}")
 
-        weights = self.personas[persona_id]['weights']
-        reranked_results = []
+        weight_vec = self.get_weight_vector(persona_id)
+        config_hash = self.personas[persona_id]['config_hash']
+
+        # Coerce each id exactly once; everything downstream (cache keys,
+        # store rows, result dicts) reuses the same string
+        candidates = []
+        provider_ids = []
+        for result in baseline_results:
+            pid = str(result['provider_id'])
+            if pid in provider_data:
+                candidates.append(result)
+                provider_ids.append(pid)
+        if not candidates:
+            return []
+
+        providers = [provider_data[pid] for pid in provider_ids]
+        n = len(candidates)
+
+        # Warm persona scores from the cache; only misses pay for feature
+        # extraction below, and fresh scores are written back afterwards
+        cached_scores = {}
+        if self.score_cache is not None:
+            cached_scores = self.score_cache.get_many(
+                persona_id, config_hash, provider_ids)
 
         # Normalize baseline scores to [0,1]
-        baseline_scores = [r['score'] for r in baseline_results]
-        max_baseline = max(baseline_scores) if baseline_scores else 1.0
-        min_baseline = min(baseline_scores) if baseline_scores else 0.0
-        baseline_range = max_baseline - min_baseline if max_baseline > min_baseline else 1.0
+        baseline_scores = np.fromiter((r['score'] for r in candidates),
+                                      dtype=np.float32, count=n)
+        min_baseline = float(baseline_scores.min())
+        baseline_range = float(baseline_scores.max()) - min_baseline
+        if baseline_range <= 0.0:
+            baseline_range = 1.0
+        normalized_baseline = (baseline_scores - min_baseline) / baseline_range
 
-        for result in baseline_results:
-            provider_id = str(result['provider_id'])
+        # Score the cache misses in one matrix product over the stacked
+        # feature columns: persona_score = F @ w
+        persona_scores = np.empty(n, dtype=np.float32)
+        # Feature detail comes from the store, so when the caller wants
+        # features a cache hit without a store row (warm SQLite cache in
+        # a fresh process) is still treated as a miss and re-extracted
+        store_rows = self._fvec_store.rows
+        miss_idx = [i for i, pid in enumerate(provider_ids)
+                    if pid not in cached_scores
+                    or (include_features and pid not in store_rows)]
+        for i, pid in enumerate(provider_ids):
+            if pid in cached_scores:
+                persona_scores[i] = cached_scores[pid]
+
+        if miss_idx:
+            miss_ids = [provider_ids[i] for i in miss_idx]
+            miss_rows = self._ensure_features(
+                miss_ids, [providers[i] for i in miss_idx])
+            if self.quantized:
+                persona = self.personas[persona_id]
+                persona_scores[miss_idx] = dot_scores_q(
+                    self._fvec_store.matrix_q[miss_rows],
+                    persona['weight_q'], persona['dequant_scale'])
+            else:
+                # Fused gather+dot: rows stream straight from the store
+                # without materializing a gathered (N, F) copy first
+                persona_scores[miss_idx] = gather_dot(
+                    self._fvec_store.matrix, miss_rows, weight_vec)
+
+        combined_scores = alpha * normalized_baseline + (1 - alpha) * persona_scores
 
-            if provider_id not in provider_data:
-                continue
+        if self.score_cache is not None:
+            self.score_cache.put_many(persona_id, config_hash, {
+                provider_ids[i]: float(persona_scores[i]) for i in miss_idx})
 
-            provider = provider_data[provider_id]
-            features = self.feature_extractor.extract_features(provider)
-            persona_score = compute_feature_score(features, weights)
-            normalized_baseline = (result['score'] - min_baseline) / baseline_range
-            combined_score = alpha * normalized_baseline + (1 - alpha) * persona_score
+        # Top-k selection: partition out the best k in O(N), sort only those
+        if top_k is not None and top_k < n:
+            order = np.argpartition(-combined_scores, top_k)[:top_k]
+            order = order[np.argsort(-combined_scores[order])]
+        else:
+            order = np.argsort(-combined_scores)
+
+        # Bind loop invariants to locals; CPython re-resolves attribute
+        # and global lookups on every iteration otherwise
+        store_matrix = self._fvec_store.matrix
+        reranked_results = []
+        append = reranked_results.append
+        for rank, i in enumerate(order, start=1):
+            provider_id = provider_ids[i]
+            provider = providers[i]
 
-            reranked_results.append({
+            entry = {
+                'rank': rank,
                 'provider_id': provider_id,
                 'provider_name': provider.get('provider_name', 'Unknown'),
                 'specialty': provider.get('specialty_readable', 'Unknown'),
-                'baseline_score': result['score'],
-                'normalized_baseline': normalized_baseline,
-                'persona_score': persona_score,
-                'combined_score': combined_score,
-                'features': features,
+                'baseline_score': candidates[i]['score'],
+                'normalized_baseline': float(normalized_baseline[i]),
+                'persona_score': float(persona_scores[i]),
+                'combined_score': float(combined_scores[i]),
                 'provider_data': provider
-            })
+            }
 
-        reranked_results.sort(key=lambda x: x['combined_score'], reverse=True)
+            if include_features:
+                # Every candidate has a store row here: cache hits
+                # without one were re-extracted above
+                row = store_rows.get(provider_id)
+                entry['features'] = {
+                    name: float(store_matrix[row, fi])
+                    for fi, name in enumerate(FEATURE_ORDER)
+                } if row is not None else {}
 
-        for i, result in enumerate(reranked_results):
-            result['rank'] = i + 1
+            append(entry)
 
         return reranked_results
 
+    def rerank_multi(
+        self,
+        baseline_results: List[Dict[str, Any]],
+        provider_data: Dict[str, Dict[str, Any]],
+        persona_ids: List[str],
+        alpha: float = 0.7,
+        top_k: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Re-rank the same baseline under several personas at once.
+
+        Features are gathered once and every persona's scores come out of
+        a single (N, F) @ (F, P) matrix product, so comparing P personas
+        costs one GEMM instead of P independent rerank passes. Returns a
+        map of persona_id -> result list shaped like rerank's output.
+        """
+        for persona_id in persona_ids:
+            if persona_id not in self.personas:
+                raise ValueError(f"Unknown persona: {persona_id}. "
+                                 f"Available: {self.get_available_personas()}")
+
+        candidates = []
+        provider_ids = []
+        for result in baseline_results:
+            pid = str(result['provider_id'])
+            if pid in provider_data:
+                candidates.append(result)
+                provider_ids.append(pid)
+        if not candidates:
+            return {persona_id: [] for persona_id in persona_ids}
+
+        providers = [provider_data[pid] for pid in provider_ids]
+        n = len(candidates)
+
+        baseline_scores = np.fromiter((r['score'] for r in candidates),
+                                      dtype=np.float32, count=n)
+        min_baseline = float(baseline_scores.min())
+        baseline_range = float(baseline_scores.max()) - min_baseline
+        if baseline_range <= 0.0:
+            baseline_range = 1.0
+        normalized_baseline = (baseline_scores - min_baseline) / baseline_range
+
+        feature_matrix = self._gather_feature_matrix(provider_ids, providers)
+        weight_columns = np.column_stack(
+            [self.personas[persona_id]['weight_vec']
+             for persona_id in persona_ids])
+        all_scores = feature_matrix @ weight_columns  # (N, P)
+
+        results = {}
+        for col, persona_id in enumerate(persona_ids):
+            persona_scores = all_scores[:, col]
+            combined_scores = (alpha * normalized_baseline
+                               + (1 - alpha) * persona_scores)
+
+            if self.score_cache is not None:
+                self.score_cache.put_many(
+                    persona_id, self.personas[persona_id]['config_hash'],
+                    {provider_ids[i]: float(persona_scores[i])
+                     for i in range(n)})
+
+            if top_k is not None and top_k < n:
+                order = np.argpartition(-combined_scores, top_k)[:top_k]
+                order = order[np.argsort(-combined_scores[order])]
+            else:
+                order = np.argsort(-combined_scores)
+
+            results[persona_id] = [{
+                'rank': rank,
+                'provider_id': provider_ids[i],
+                'provider_name': providers[i].get('provider_name', 'Unknown'),
+                'specialty': providers[i].get('specialty_readable', 'Unknown'),
+                'baseline_score': candidates[i]['score'],
+                'normalized_baseline': float(normalized_baseline[i]),
+                'persona_score': float(persona_scores[i]),
+                'combined_score': float(combined_scores[i]),
+                'provider_data': providers[i]
+            } for rank, i in enumerate(order, start=1)]
+
+        return results
+
+    def _ensure_features(self, provider_ids: List[str],
+                         providers: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract any unseen providers into the store; return row indices.
+
+        Extraction is deterministic per provider record, so each row is
+        computed at most once per process.
+        """
+        known = self._fvec_store.rows
+        uncached = [i for i, pid in enumerate(provider_ids)
+                    if pid not in known]
+
+        if uncached:
+            extracted = self.feature_extractor.extract_features_matrix(
+                [providers[i] for i in uncached])
+            self._fvec_store.add([provider_ids[i] for i in uncached],
+                                 extracted)
+
+        return self._fvec_store.row_indices(provider_ids)
+
+    def _gather_feature_matrix(self, provider_ids: List[str],
+                               providers: List[Dict[str, Any]]) -> np.ndarray:
+        """Assemble the (N, F) feature matrix via one fancy-index."""
+        return self._fvec_store.matrix[
+            self._ensure_features(provider_ids, providers)]
+
     def explain_ranking(self, result: Dict[str, Any], persona_id: str, top_k: int = 5) -> Dict[str, Any]:
         """Return top contributing features for a ranking decision."""
         if persona_id not in self.personas:
             return {}
 
-        weights = self.personas[persona_id]['weights']
-        features = result.get('features', {})
+        weight_vec = self.personas[persona_id]['weight_vec']
+
+        # Prefer the vector the scoring path actually used; fall back to
+        # the result's features dict only when the store has no row
+        # (e.g. the score came straight from the SQLite cache)
+        features_vec = None
+        row = self._fvec_store.rows.get(str(result.get('provider_id', '')))
+        if row is not None:
+            features_vec = self._fvec_store.matrix[row]
+        else:
+            features = result.get('features', {})
+            if features:
+                features_vec = np.fromiter(
+                    (features.get(name, 0.0) for name in self.feature_names),
+                    dtype=np.float32, count=len(self.feature_names))
 
-        contributions = []
-        for feature_name, weight in weights.items():
-            if feature_name in features:
-                contribution = features[feature_name] * weight
-                contributions.append({
-                    'feature': feature_name,
-                    'value': features[feature_name],
-                    'weight': weight,
-                    'contribution': contribution
-                })
+        top_features = []
+        if features_vec is not None:
+            contribs = features_vec * weight_vec
 
-        contributions.sort(key=lambda x: abs(x['contribution']), reverse=True)
+            # Partial selection: only the top_k contributions are sorted
+            k = min(top_k, len(contribs))
+            idx = np.argpartition(-np.abs(contribs), k - 1)[:k]
+            idx = idx[np.argsort(-np.abs(contribs[idx]))]
+
+            top_features = [{
+                'feature': self.feature_names[i],
+                'value': float(features_vec[i]),
+                'weight': float(weight_vec[i]),
+                'contribution': float(contribs[i])
+            } for i in idx]
 
         return {
             'provider_id': result['provider_id'],
@@ -141,27 +490,15 @@ class PersonaReranker:
             'combined_score': result['combined_score'],
             'baseline_score': result['baseline_score'],
             'persona_score': result['persona_score'],
-            'top_features': contributions[:top_k],
+            'top_features': top_features,
             'persona': self.get_persona_info(persona_id)
         }
 
 
 def load_provider_data(jsonl_path: str, provider_ids: List[str]) -> Dict[str, Dict[str, Any]]:
-    """Load provider records for specified NPIs from JSONL file."""
-    provider_ids_set = set(str(pid) for pid in provider_ids)
-    providers = {}
-
-    with open(jsonl_path, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
-
-            provider = json.loads(line)
-            provider_id = str(provider.get('NPI'))
-
-            if provider_id in provider_ids_set:
-                providers[provider_id] = provider
-                if len(providers) == len(provider_ids_set):
-                    break
+    """Load provider records for specified NPIs from JSONL file.
 
-    return providers
+    Reads only the requested records via the NPI offset index rather than
+    scanning the file per request.
+    """
+    return fetch_records(jsonl_path, provider_ids)
@@ -0,0 +1,63 @@
+"""SQLite-backed cache for persona rerank scores."""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+
+class ScorerCache:
+    """Persists (persona, provider, config) -> persona score.
+
+    Persona scores are deterministic given a fixed persona config, so warm
+    lookups replace the per-provider feature extraction with a single
+    SELECT over the candidate set. The config hash keys entries so edits
+    to a persona JSON naturally invalidate its cached scores.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "  persona TEXT NOT NULL,"
+            "  pid TEXT NOT NULL,"
+            "  cfg TEXT NOT NULL,"
+            "  score REAL NOT NULL,"
+            "  PRIMARY KEY (persona, pid, cfg)"
+            ")"
+        )
+        self._conn.commit()
+
+    def get_many(self, persona_id: str, config_hash: str,
+                 provider_ids: Iterable[str]) -> Dict[str, float]:
+        """Return cached scores for the given providers (missing ids omitted)."""
+        provider_ids = [str(pid) for pid in provider_ids]
+        if not provider_ids:
+            return {}
+
+        placeholders = ','.join('?' * len(provider_ids))
+        query = (f"SELECT pid, score FROM scores "
+                 f"WHERE persona = ? AND cfg = ? AND pid IN ({placeholders})")
+        with self._lock:
+            rows = self._conn.execute(
+                query, [persona_id, config_hash] + provider_ids).fetchall()
+        return dict(rows)
+
+    def put_many(self, persona_id: str, config_hash: str,
+                 scores: Dict[str, float]):
+        """Upsert freshly computed scores."""
+        if not scores:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores (persona, pid, cfg, score) "
+                "VALUES (?, ?, ?, ?)",
+                [(persona_id, str(pid), config_hash, float(score))
+                 for pid, score in scores.items()])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
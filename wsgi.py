@@ -0,0 +1,16 @@
+"""Gunicorn entry point for the provider search API.
+
+Run with:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Services are initialized per worker from the post_fork hook in
+gunicorn.conf.py, so each worker owns its own LuceneSearcher.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from api import app  # noqa: E402,F401